@@ -4,10 +4,13 @@
 
 ## python imports
 
+import csv
 from argparse import ArgumentParser
 from datetime import datetime, timedelta
 from enum import IntEnum
+from functools import partial
 from os.path import abspath, dirname, join
+from xml.etree.ElementTree import Element, SubElement, tostring
 
 ## internal imports
 
@@ -28,13 +31,15 @@ argument_parser.add_argument(
     "--attr",
     help="The attribute to diff upon when determining changes in position.",
     type=str,
+    choices=("city", "country"),
     default="country"
 )
 argument_parser.add_argument(
     "-e",
     "--export",
-    help="The file type that should be exported (stdout/xml/csv/kml).",
+    help="The file type that should be exported (stdout/csv/kml).",
     type=str,
+    choices=("stdout", "csv", "kml"),
     default="stdout"
 )
 argument_parser.add_argument(
@@ -70,40 +75,62 @@ def print_node(action, node, timedelta):
     elif action == Action.EXITING:
         print(f"Exiting {node.city}, {node.country} after {timedelta}.")
 
-def write_node_csv(action, node, timedelta, filepointer):
+# Size of the write buffer used for exported files.
+EXPORT_BUFFER_SIZE = 1024 * 1024
+
+# KML colors are expressed in aabbggrr format.
+KML_STYLES = {
+    "entering": "ff00ff00", # GREEN
+    "exiting": "ff0000ff", # RED
+}
+
+def write_node_csv(action, node, timedelta, csv_writer):
     """Writes the state of the action and the location city/country to CSV."""
     if action == Action.ENTERING:
-        # Using '' instead of "" due to use of them within CSV output.
-        filepointer.write(
-            f'"Entering","{node.city}","{node.country}","{timedelta}",,\n'
-        )
+        csv_writer.writerow(("Entering", node.city, node.country, timedelta, ""))
     elif action == Action.EXITING:
-        # Using '' instead of "" due to use of them within CSV output.
-        filepointer.write(
-            f'"Exiting","{node.city}","{node.country}","","{timedelta}",\n'
-        )
+        csv_writer.writerow(("Exiting", node.city, node.country, "", timedelta))
+
+def open_kml(filepath, name):
+    """Opens the KML file for writing, writing the document header and styles
+    so that placemarks can be streamed to it as they are produced."""
+    filepointer = open(filepath, "w", encoding="utf-8",
+        buffering=EXPORT_BUFFER_SIZE)
+    filepointer.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    filepointer.write('<kml xmlns="http://www.opengis.net/kml/2.2"><Document>')
 
-def write_node_kml(action, node, timedelta, kml_doc, kml_styles):
+    document_name = Element("name")
+    document_name.text = name
+    filepointer.write(tostring(document_name, encoding="unicode"))
+
+    for style_id, color in KML_STYLES.items():
+        style = Element("Style", id=style_id)
+        SubElement(SubElement(style, "IconStyle"), "color").text = color
+        filepointer.write(tostring(style, encoding="unicode"))
+
+    return filepointer
+
+def write_node_kml(action, node, timedelta, filepointer):
     """Writes the state of the action and the location city/country to KML."""
+    placemark = Element("Placemark")
     if action == Action.ENTERING:
-        # Ugly way of achieving this, however KML library doesn't support style
-        #  as kwargs...
-        point = kml_doc.newpoint(
-            name=f"Entering {node.city}, {node.country}",
-            description=str(timedelta),
-            coords=[node.as_tuple()]
-        )
-        point.iconstyle = kml_styles[0]
-
+        SubElement(placemark, "name").text = \
+            f"Entering {node.city}, {node.country}"
+        SubElement(placemark, "styleUrl").text = "#entering"
     elif action == Action.EXITING:
-        # Ugly way of achieving this, however KML library doesn't support style
-        #  as kwargs...
-        point = kml_doc.newpoint(
-            name=f"Exiting {node.city}, {node.country}",
-            description=str(timedelta),
-            coords=[node.as_tuple()]
-        )
-        point.iconstyle = kml_styles[1]
+        SubElement(placemark, "name").text = \
+            f"Exiting {node.city}, {node.country}"
+        SubElement(placemark, "styleUrl").text = "#exiting"
+
+    SubElement(placemark, "description").text = str(timedelta)
+    point = SubElement(placemark, "Point")
+    SubElement(point, "coordinates").text = ",".join(map(str, node.as_tuple()))
+    filepointer.write(tostring(placemark, encoding="unicode"))
+
+def close_kml(filepointer):
+    """Writes the document footer and closes the KML file."""
+    filepointer.write("</Document></kml>\n")
+    filepointer.close()
 
 # Actually handling script usage.
 # Only run if directly run by user.
@@ -112,83 +139,56 @@ if __name__ == "__main__":
     args = argument_parser.parse_args()
 
     # Validate the JSON provided is a Location History export.
-    json = generate_location_history_json(args.filepath)
+    locations = generate_location_history_json(args.filepath)
 
-    if args.startdate and args.enddate:
+    # Gather the range of timestamps by milliseconds to filter upon.
+    date1Ms = date2Ms = None
+    if args.startdate:
         date1Ms = datetime.fromisoformat(args.startdate).timestamp() * 1000
+    if args.enddate:
         date2Ms = datetime.fromisoformat(args.enddate).timestamp() * 1000
 
-        # Generate dynamic function to handle filtering upon timestamps by
-        #  milliseconds.
-        def _new_filter(item):
-            value = int(item.get("timestampMs", 0))
-            if value == 0 or value > date2Ms or value < date1Ms:
-                return False
-            return True
-
     # Start the iteration... and return in generator form.
-        generator = iter_unique_path_by_attribute(args.attr, json["locations"], _new_filter)
-    else:
-        generator = iter_unique_path_by_attribute(args.attr, json["locations"])
-
-    # Upon requesting CSV, open the CSV file for writing.
-    if args.export == "csv":
-        csv = open(
+    generator = iter_unique_path_by_attribute(args.attr, locations, date1Ms,
+        date2Ms)
+
+    # Resolve the function used to output each node, upon requesting CSV or
+    #  KML opening the file for writing.
+    if args.export == "stdout":
+        emit = print_node
+    elif args.export == "csv":
+        csv_fp = open(
             join(dirname(args.filepath), f"{args.filename}.csv"),
-            "w+"
+            "w",
+            encoding="utf-8",
+            newline="",
+            buffering=EXPORT_BUFFER_SIZE
         )
-        # Using '' instead of "" due to use of them within CSV output.
-        csv.write('"Action","City","Country","DateTime","TimeDelta",\n')
+        csv_writer = csv.writer(csv_fp)
+        csv_writer.writerow(("Action", "City", "Country", "DateTime", "TimeDelta"))
+        emit = partial(write_node_csv, csv_writer=csv_writer)
+    # Stream placemarks into the KML file as they are produced.
     elif args.export == "kml":
-        try:
-            from simplekml import Kml, Style, IconStyle, ItemIcon
-        except ImportError:
-            raise ImportError(f"To export as KML, use `pip install simplekml`.")
-        kml = Kml(name=f"Location History {args.attr.capitalize()} Changes")
-        kml_styles = [
-            IconStyle(
-                color="#00FF00", # GREEN
-            ),
-            IconStyle(
-                color="#FF0000", # RED
-            )
-        ]
+        kml = open_kml(
+            join(dirname(args.filepath), f"{args.filename}.kml"),
+            f"Location History {args.attr.capitalize()} Changes"
+        )
+        emit = partial(write_node_kml, filepointer=kml)
 
     # Start iterating over the generator.
     # The generator will output the previous and next node when detecting a change in
     #  attribute, whether this be on city or country change.
     for prev_node, prev_timestampMs, next_node, next_timestampMs in generator:
-        # Case when printing out first node.
-        if prev_node is None:
-            next_datetime = datetime.fromtimestamp(next_timestampMs / 1000)
-            if args.export == "stdout":
-                print_node(Action.ENTERING, next_node, next_datetime)
-            elif args.export == "csv":
-                write_node_csv(Action.ENTERING, next_node, next_datetime, csv)
-            elif args.export == "kml":
-                write_node_kml(Action.ENTERING, next_node, next_datetime, kml,
-                    kml_styles)
-        else:
+        # Skip exiting when outputting the first node.
+        if prev_node is not None:
             time_spent = timedelta(milliseconds=next_timestampMs - prev_timestampMs)
-            if args.export == "stdout":
-                print_node(Action.EXITING, prev_node, time_spent)
-            elif args.export == "csv":
-                write_node_csv(Action.EXITING, prev_node, time_spent, csv)
-            elif args.export == "kml":
-                write_node_kml(Action.EXITING, prev_node, time_spent, kml,
-                    kml_styles)
-
-            next_datetime = datetime.fromtimestamp(next_timestampMs / 1000)
-            if args.export == "stdout":
-                print_node(Action.ENTERING, next_node, next_datetime)
-            elif args.export == "csv":
-                write_node_csv(Action.ENTERING, next_node, next_datetime, csv)
-            elif args.export == "kml":
-                write_node_kml(Action.ENTERING, next_node, next_datetime, kml,
-                    kml_styles)
+            emit(Action.EXITING, prev_node, time_spent)
+
+        next_datetime = datetime.fromtimestamp(next_timestampMs / 1000)
+        emit(Action.ENTERING, next_node, next_datetime)
 
     # Close up any opened files.
     if args.export == "csv":
-        csv.close()
+        csv_fp.close()
     elif args.export == "kml":
-        kml.save(join(dirname(args.filepath), f"{args.filename}.kml"))
\ No newline at end of file
+        close_kml(kml)
\ No newline at end of file
@@ -7,31 +7,95 @@
 from dataclasses import dataclass
 from datetime import datetime
 from locale import getdefaultlocale
-from typing import Any
+from os.path import expanduser, join
 
 ## external imports
 
-from .tools import classproperty
+import numpy as np
 
 # Check if the geopy library is available before trying relative imports.
 use_geopy = True
 
-from .reverse_geocode import reverse_coordinates
+from .reverse_geocode import reverse_coordinates, search
 
 try:
+    from geopy.extra.rate_limiter import RateLimiter
     from geopy.geocoders import Nominatim
 except ImportError:
     use_geopy = False
 
+# Check if the diskcache library is available to persist reversed addresses.
+use_diskcache = True
+
+try:
+    from diskcache import Cache
+except ImportError:
+    use_diskcache = False
+
 ## __all__ declaration
 
-__all__ = ("Coordinate", )
+__all__ = (
+    "Coordinate",
+    "reverse_many",
+)
 
 ## globals
 
 # Used by openstreetmaps for correctly handling language.
 locale = getdefaultlocale()[:2]
 
+# Number of decimal places coordinates are rounded to when caching reversed
+#  coordinates, roughly a 100m bucket.
+COORDINATE_PRECISION = 3
+
+# Reversed coordinates, keyed upon the bucket they were rounded to.
+_REVERSED = {}
+
+# Directory addresses reversed by openstreetmaps are persisted within.
+ADDRESS_CACHE_DIRECTORY = join(expanduser("~"), ".cache", "geodeconstructor")
+
+# Singletons of geopy's openstreetmaps interface and the address cache,
+#  created upon first use.
+_GEOLOCATOR = None
+_ADDRESS_CACHE = None
+
+def _get_geolocator():
+    """Returns the reverse function of geopy's openstreetmaps interface,
+    limited to the one request per second their usage policy requires."""
+    global _GEOLOCATOR
+    if _GEOLOCATOR is None:
+        _GEOLOCATOR = RateLimiter(
+            Nominatim(user_agent="geo-deconstructor").reverse,
+            min_delay_seconds=1,
+            swallow_exceptions=False
+        )
+    return _GEOLOCATOR
+
+def _get_address_cache():
+    """Returns the persistent address cache, or None without diskcache."""
+    global _ADDRESS_CACHE
+    if _ADDRESS_CACHE is None and use_diskcache:
+        _ADDRESS_CACHE = Cache(ADDRESS_CACHE_DIRECTORY)
+    return _ADDRESS_CACHE
+
+def _reverse_address(latitude: float, longitude: float):
+    """Reverses the coordinates to an address using openstreetmaps, reusing
+    any address previously stored in the persistent cache for the same rounded
+    bucket. Failed requests raise rather than being stored."""
+    key = (_round_coordinate(latitude, longitude), locale)
+    cache = _get_address_cache()
+    if cache is not None and key in cache:
+        return cache[key]
+
+    # Reverse the coordinates to address using local language.
+    location = _get_geolocator()(
+        f"{latitude:0.6f}, {longitude:0.6f}", language=locale
+    )
+    address = location.address if location else ''
+    if cache is not None:
+        cache[key] = address
+    return address
+
 ## Coordinate declaration
 
 @dataclass
@@ -49,16 +113,15 @@ class Coordinate:
     city: str = ''
     country: str = ''
 
-    _geolocator: Any = None
-
     @classmethod
     def init_with_georeverse(cls, latitude: float, longitude: float):
-        """Initializes the Coordinates instance and then calls the `reverse`
-        function.
+        """Initializes the Coordinates instance with the city/country of the
+        reversed coordinates. Results are cached upon the coordinates rounded
+        to roughly 100m, so coordinates sharing a bucket take the city/country
+        of the first coordinate reversed within it.
         """
-        instance = cls(latitude, longitude)
-        instance.reverse()
-        return instance
+        cached = _reverse_cached(latitude, longitude)
+        return cls(latitude, longitude, cached.city, cached.country)
 
     def as_tuple(self):
         """Returns the longitude and latitude as a coordinate tuple for KML."""
@@ -78,21 +141,64 @@ class Coordinate:
         # On geopy library available, use openstreetmaps api. Much slower as
         #  sends HTTP requests to their REST API.
         else:
-            # Reverse the coordinates to address using local language.
-            location = self.geolocator.reverse(
-                f"{self.latitude:0.6f}, {self.longitude:0.6f}", language=locale
-            )
+            address = _reverse_address(self.latitude, self.longitude)
             location_split = list(
                 map(
                     lambda x: x.strip(' '),
-                    location.address.split(',')
+                    address.split(',')
                 )
             )
-            self.country, self.city = location_split[-1], location_split[1:-2]
-
-    @classproperty
-    def geolocator(cls):
-        # Implementation of a singleton for geopy's openstreetmaps interface.
-        if not cls._geolocator:
-            cls._geolocator = Nominatim(user_agent="geo-deconstructor")
-        return cls._geolocator
\ No newline at end of file
+            self.country = location_split[-1]
+            self.city = ", ".join(location_split[1:-2])
+
+## Batch reversing declaration
+
+def reverse_many(coordinates):
+    """Reverses every coordinate provided, returning arrays of the cities and
+    countries in the same order. Reversed as a single batch when using the
+    dataset.
+
+    :param coordinates: An (N, 2) array of latitude, longitude coordinates.
+    :type coordinates: numpy.ndarray
+    """
+    # Nothing to reverse when no coordinates are provided.
+    if not len(coordinates):
+        return np.empty(0, dtype=object), np.empty(0, dtype=object)
+
+    # On reverse_geocode library available, query the dataset once for every
+    #  coordinate.
+    if not use_geopy:
+        return search(coordinates)
+
+    # On geopy library available, each coordinate must be requested
+    #  individually so go through the cache, requesting each rounded
+    #  coordinate only once.
+    cities = np.empty(len(coordinates), dtype=object)
+    countries = np.empty(len(coordinates), dtype=object)
+    for index, (latitude, longitude) in enumerate(coordinates.tolist()):
+        coordinate = _reverse_cached(latitude, longitude)
+        cities[index], countries[index] = coordinate.city, coordinate.country
+
+    return cities, countries
+
+## Caching declaration
+
+def _round_coordinate(latitude: float, longitude: float):
+    """Rounds the coordinates to the bucket they are cached upon."""
+    return (
+        round(latitude, COORDINATE_PRECISION),
+        round(longitude, COORDINATE_PRECISION)
+    )
+
+def _reverse_cached(latitude: float, longitude: float):
+    """Reverses the coordinates provided, caching the resulting
+    :class:`Coordinate` upon their rounded bucket to be copied from by later
+    coordinates within the same bucket.
+    """
+    bucket = _round_coordinate(latitude, longitude)
+    instance = _REVERSED.get(bucket)
+    if instance is None:
+        instance = Coordinate(latitude, longitude)
+        instance.reverse()
+        _REVERSED[bucket] = instance
+    return instance
\ No newline at end of file
@@ -5,9 +5,29 @@
 ## python imports
 
 from functools import partial
-from json import load, loads
 from os import walk
-from os.path import isdir, isfile, join
+from os.path import getsize, isdir, isfile, join
+
+## external imports
+
+# Check if the ijson library is available to stream large JSON files.
+use_ijson = True
+
+try:
+    import ijson
+except ImportError:
+    use_ijson = False
+
+# Prefer orjson when loading the whole JSON file as it parses much quicker.
+try:
+    from orjson import loads
+except ImportError:
+    from json import loads
+
+## globals
+
+# Files larger than this (in bytes) are streamed rather than loaded whole.
+STREAMING_THRESHOLD = 500 * 1024 * 1024
 
 ## __all__ declaration
 
@@ -18,17 +38,42 @@ __all__ = (
 
 ## open and validate json files
 
+def _contains_key(key_name: str, filepointer):
+    """Checks the top level of the JSON provided for the key, parsing only as
+    far as is necessary to find it."""
+    for prefix, event, value in ijson.parse(filepointer):
+        if prefix == "" and event == "map_key" and value == key_name:
+            return True
+    return False
+
+def _iter_json_items(key_name: str, filepath: str):
+    """Generates each item of the list under the key, streaming the file
+    rather than loading it into memory."""
+    with open(filepath, "rb") as fp:
+        yield from ijson.items(fp, f"{key_name}.item", use_float=True)
+
 def _generate_json_and_validate(key_name: str, filepath: str):
     if not isfile(filepath):
         raise FileNotFoundError(f"{filepath} could not be identified.")
 
-    with open(filepath) as fp:
-        json = load(fp)
+    # On ijson library available, stream the items under the key of large
+    #  files so that exports larger than memory can be handled. Smaller files
+    #  are quicker to load whole.
+    if use_ijson and getsize(filepath) > STREAMING_THRESHOLD:
+        with open(filepath, "rb") as fp:
+            if not _contains_key(key_name, fp):
+                raise ValueError(
+                    f"Cannot find {key_name} key within JSON provided."
+                )
+        return _iter_json_items(key_name, filepath)
+
+    with open(filepath, "rb") as fp:
+        json = loads(fp.read())
 
     if key_name not in json.keys():
         raise ValueError(f"Cannot find {key_name} key within JSON provided.")
 
-    return json
+    return json[key_name]
 
 generate_location_history_json = partial(
     _generate_json_and_validate,
@@ -5,11 +5,15 @@
 ## python imports
 
 from functools import partial
-from typing import Any, Sequence
+from typing import Any, Iterable
+
+## external imports
+
+import numpy as np
 
 ## library imports
 
-from ..components import Coordinate
+from ..components import Coordinate, reverse_many
 
 ## __all__ declaration
 
@@ -19,18 +23,26 @@ __all__ = (
     "iter_unique_country_path"
 )
 
-## generator - iter through location list and identify when country changes
+## globals
+
+# Scale of the latitudeE7/longitudeE7 values within Location History.
+E7_SCALE = 10000000
 
-def _default_filter_func(item: Any):
-    """Filter function that verifies timestampMs key is available."""
-    return item.get("timestampMs", 0) != 0
+# Attributes that can be compared, mapped to their position within the arrays
+#  returned by `reverse_many`.
+_ATTRIBUTES = {"city": 0, "country": 1}
 
-def _default_key_func(item: Any):
-    """Key function that orders based upon timestampMs value."""
-    return item.get("timestampMs")
+## change detection
+
+def _find_changes(values):
+    """Returns every index at which the value differs from the value before
+    it."""
+    return np.flatnonzero(values[1:] != values[:-1]) + 1
+
+## generator - iter through location list and identify when country changes
 
-def iter_unique_path_by_attribute(attribute: str, locations: Sequence[Any],
-    filter_func=_default_filter_func, key_func=_default_key_func):
+def iter_unique_path_by_attribute(attribute: str, locations: Iterable[Any],
+    start_timestampMs: float = None, end_timestampMs: float = None):
     """Generates a tuple set of unique visits to the attribute specified,
     yielding the previous and next location on each iteration. The first
     iteration will return None, None for the previous node and time. After this,
@@ -40,86 +52,107 @@ def iter_unique_path_by_attribute(attribute: str, locations: Sequence[Any],
     city, country
     :type attribute: str
 
-    :param locations: The locations list from the Location History.json
-    :type locations: list[dict]
+    :param locations: The locations from the Location History.json
+    :type locations: Iterable[dict]
 
-    :param filter_func: The filter function to apply to the list before
-    iteration. Default: verifies the timestamp is available.
-    :type func: func(item)
+    :param start_timestampMs: The timestamp in milliseconds to start iterating
+    from, inclusive. Default: the earliest location.
+    :type start_timestampMs: float
 
-    :param key_func: The key function to apply during the sorting process,
-    typically used to sort the list in chronological order.
-    :type key_func: func(item)
+    :param end_timestampMs: The timestamp in milliseconds to stop iterating at,
+    inclusive. Default: the latest location.
+    :type end_timestampMs: float
     """
-    # Order chronologically and filter non-useful objects.
-    locations_chronological = list(
-        iter_chronologically(locations, filter_func, key_func)
-    )
-    # Gather initial data for first iteration.
-    initial_location = locations_chronological[0]
-    initial_latitude = initial_location["latitudeE7"] / 10000000
-    initial_longitude = initial_location["longitudeE7"] / 10000000
-    initial_timestamp = int(initial_location["timestampMs"])
-    initial_coordinate = Coordinate.init_with_georeverse(initial_latitude,
-        initial_longitude)
-    yield None, None, initial_coordinate, initial_timestamp
-
-    # Setup stores needed for use during iteration.
-    current_coordinate = None
-    last_coordinate = initial_coordinate
-    last_location = initial_location
-
-    # Ensure we never overflow the list iteration by gathering the length.
-    end_index = len(locations_chronological)
-    for index in range(1, end_index - 1):
-        # Initialise the first to be the current location.
-        if not current_coordinate:
-            current_location = locations_chronological[index]
-            current_latitude = current_location["latitudeE7"] / 10000000
-            current_longitude = current_location["longitudeE7"] / 10000000
-            current_coordinate = Coordinate.init_with_georeverse(
-                current_latitude,
-                current_longitude
-            )
-
-        next_location = locations_chronological[index + 1]
-        next_latitude = next_location["latitudeE7"] / 10000000
-        next_longitude = next_location["longitudeE7"] / 10000000
-        next_coordinate = Coordinate.init_with_georeverse(
-            next_latitude,
-            next_longitude
+    # Validate before creating the generator so that an unknown attribute
+    #  raises upon calling rather than upon the first iteration.
+    if attribute not in _ATTRIBUTES:
+        raise ValueError(
+            f"Cannot compare upon {attribute}, expected one of "
+            f"{', '.join(_ATTRIBUTES)}."
         )
 
-        # Compare the attribute provided and yield if necessary.
-        if getattr(next_coordinate, attribute) != getattr(current_coordinate, attribute):
-            yield (current_coordinate, int(last_location["timestampMs"]),
-                next_coordinate, int(next_location["timestampMs"]))
-            last_coordinate = next_coordinate
-            last_location = next_location
+    return _iter_unique_path_by_attribute(attribute, locations,
+        start_timestampMs, end_timestampMs)
+
+def _iter_unique_path_by_attribute(attribute: str, locations: Iterable[Any],
+    start_timestampMs: float = None, end_timestampMs: float = None):
+    """Generator behind :func:`iter_unique_path_by_attribute`, expecting the
+    attribute to have already been validated."""
+    # Order chronologically and filter non-useful objects, splitting them into
+    #  arrays of each value used during iteration.
+    latitudes, longitudes, timestamps = gather_chronologically(
+        locations,
+        start_timestampMs,
+        end_timestampMs
+    )
+
+    # Nothing to iterate when no locations remain after filtering.
+    if not len(timestamps):
+        return
+
+    # Reverse every coordinate as a single batch before iterating.
+    reversed_values = reverse_many(np.column_stack((latitudes, longitudes)))
+    cities, countries = reversed_values
+    values = reversed_values[_ATTRIBUTES[attribute]]
+
+    def coordinate_at(index):
+        return Coordinate(float(latitudes[index]), float(longitudes[index]),
+            cities[index], countries[index])
+
+    # Identify every index at which a visit begins; the first location always
+    #  beginning the first visit.
+    visit_indices = np.concatenate(([0], _find_changes(values))).tolist()
 
-        # Store next value into current for use in prior iteration.
-        current_coordinate = next_coordinate
-        current_location = next_location
+    for visit, index in enumerate(visit_indices):
+        if index == 0:
+            yield None, None, coordinate_at(index), int(timestamps[index])
+        else:
+            entry_index = visit_indices[visit - 1]
+            yield (coordinate_at(index - 1), int(timestamps[entry_index]),
+                coordinate_at(index), int(timestamps[index]))
 
 iter_unique_city_path = partial(iter_unique_path_by_attribute, "city")
 iter_unique_country_path = partial(iter_unique_path_by_attribute, "country")
 
-## generator - iter location list chronologically
+## gather location list chronologically
 
-def iter_chronologically(list_object: Sequence[Any], filter_func, key_func):
-    """Generates a list of objects from the list of objects provided,
-    filtering using the provided filter function and ordering by the
-    provided key function.
+def gather_chronologically(locations: Iterable[Any],
+    start_timestampMs: float = None, end_timestampMs: float = None):
+    """Gathers the latitudes, longitudes and timestamps of the locations
+    provided into arrays in chronological order, dropping locations without a
+    timestamp or outside of the range provided.
 
-    :param list_object: A list of objects.
-    :type list_object: list
+    :param locations: The locations from the Location History.json
+    :type locations: Iterable[dict]
 
-    :param filter_func: A function return True or False on whether should
-    be in output list.
-    :type filter_func: func(item)
+    :param start_timestampMs: The earliest timestamp to include, if any.
+    :type start_timestampMs: float
 
-    :param key_func: A function that returns the keyvalue to sort upon.
-    :type key_func: func(item)
+    :param end_timestampMs: The latest timestamp to include, if any.
+    :type end_timestampMs: float
     """
-    list_object = filter(filter_func, list_object)
-    yield from sorted(list_object, key=key_func)
\ No newline at end of file
+    # Gather each value in a single pass, parsing every timestamp only once.
+    latitudes, longitudes, timestamps = [], [], []
+    for location in locations:
+        timestamp = int(location.get("timestampMs", 0))
+        if timestamp != 0:
+            latitudes.append(location["latitudeE7"])
+            longitudes.append(location["longitudeE7"])
+            timestamps.append(timestamp)
+
+    # Mask out the locations outside of the range requested, then order only
+    #  those remaining chronologically.
+    timestamps = np.array(timestamps, dtype=np.int64)
+    mask = np.ones(len(timestamps), dtype=bool)
+    if start_timestampMs is not None:
+        mask &= timestamps >= start_timestampMs
+    if end_timestampMs is not None:
+        mask &= timestamps <= end_timestampMs
+    indices = np.flatnonzero(mask)
+    indices = indices[timestamps[indices].argsort(kind="stable")]
+
+    return (
+        np.array(latitudes, dtype=np.int64)[indices] / E7_SCALE,
+        np.array(longitudes, dtype=np.int64)[indices] / E7_SCALE,
+        timestamps[indices]
+    )
\ No newline at end of file
@@ -15,8 +15,11 @@ The module has been adjusted to make use of Python's
 
 import csv
 import os
+import pickle
 import sys
-from zipfile import ZipFile
+from tempfile import mkstemp
+from threading import Lock
+from zipfile import BadZipFile, ZipFile
 
 # Handle Win32 Excel setups.
 if sys.platform == 'win32':
@@ -32,6 +35,8 @@ except ImportError:
 
 ## third-party packages
 
+import numpy as np
+
 # Raise error upon loading with missing SciPy.
 try:
     from scipy.spatial import cKDTree as KDTree
@@ -55,6 +60,18 @@ __all__ = (
 GEOCODE_URL = 'http://download.geonames.org/export/dump/cities1000.zip'
 GEOCODE_FILENAME = 'cities1000.txt'
 
+# Errors raised upon reading a cache file that is corrupt or incompatible.
+CACHE_ERRORS = (
+    OSError,
+    EOFError,
+    ValueError,
+    KeyError,
+    AttributeError,
+    ImportError,
+    pickle.UnpicklingError,
+    BadZipFile,
+)
+
 ## Singleton declaration
 
 class Singleton(type):
@@ -64,9 +81,14 @@ class Singleton(type):
      an example.
     """
 
+    _lock = Lock()
+
     def __call__(cls, *args, **kwargs):
-        if not cls._instance:
-            cls._instance = super().__call__(*args, **kwargs)
+        # Only take the lock while the instance has yet to be created.
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__call__(*args, **kwargs)
         return cls._instance
 
 ## GeocodeData declaration
@@ -81,25 +103,94 @@ class GeocodeData(metaclass=Singleton):
     def __init__(
         self,
         geocode_filename='geocode.csv',
-        country_filename='countries.csv'
+        country_filename='countries.csv',
+        cache_filename='geocode.npz',
+        tree_filename='geocode.kdtree'
     ):
-        coordinates, self.locations = self.extract(rel_path(geocode_filename))
-        self.tree = KDTree(coordinates)
+        geocode_filename = rel_path(geocode_filename)
+        coordinates, self.cities, self.country_codes = self.load(
+            geocode_filename,
+            rel_path(cache_filename)
+        )
+        self.tree = self.load_tree(
+            coordinates,
+            geocode_filename,
+            rel_path(tree_filename)
+        )
         self.countries = {}
         self.load_countries(rel_path(country_filename))
 
+        # Resolve the country name of every location once, up front.
+        self.country_names = np.array(
+            [self.countries.get(code, '') for code in self.country_codes],
+            dtype=object
+        )
+
+
+    def load(self, geocode_filename, cache_filename):
+        """Load geocode data from the binary cache, rebuilding the cache from
+        the compact CSV when missing, outdated or unreadable
+        """
+        if is_up_to_date(cache_filename, geocode_filename):
+            try:
+                with np.load(cache_filename) as data:
+                    return (
+                        data['coordinates'],
+                        unpack_strings(data['cities_utf8']),
+                        unpack_strings(data['country_codes_utf8'])
+                    )
+            except CACHE_ERRORS:
+                pass
+
+        coordinates, cities, country_codes = self.extract(geocode_filename)
+        try:
+            write_atomically(cache_filename, lambda fp: np.savez(
+                fp,
+                coordinates=coordinates,
+                cities_utf8=pack_strings(cities),
+                country_codes_utf8=pack_strings(country_codes)
+            ))
+        except OSError:
+            pass
+        return coordinates, cities, country_codes
+
+    def load_tree(self, coordinates, geocode_filename, tree_filename):
+        """Load the KDTree of coordinates from disk, building and storing it
+        when missing, outdated or unreadable
+        """
+        if is_up_to_date(tree_filename, geocode_filename):
+            try:
+                with open(tree_filename, 'rb') as fp:
+                    tree = pickle.load(fp)
+                if tree.n == len(coordinates):
+                    return tree
+            except CACHE_ERRORS:
+                pass
+
+        tree = KDTree(coordinates)
+        try:
+            write_atomically(tree_filename, lambda fp: pickle.dump(
+                tree,
+                fp,
+                protocol=pickle.HIGHEST_PROTOCOL
+            ))
+        except OSError:
+            pass
+        return tree
 
     def load_countries(self, country_filename):
         """Load a map of country code to name
         """
-        for code, name in csv.reader(open(country_filename)):
-            self.countries[code] = name
+        with open(country_filename, encoding='utf8') as fp:
+            for code, name in csv.reader(fp):
+                self.countries[code] = name
 
     def query(self, coordinates):
-        """Find closest match to this list of coordinates
+        """Find closest match to this list of coordinates, returning arrays of
+        the cities and countries matched
         """
         try:
-            distances, indices = self.tree.query(coordinates, k=1)
+            distances, indices = self.tree.query(coordinates, k=1, workers=-1)
         except:
             raise ValueError(
                 "Could not identify from coordinates {}".format(
@@ -107,16 +198,7 @@ class GeocodeData(metaclass=Singleton):
                 )
             )
         else:
-            if type(indices) == int:
-                return [{}]
-
-            results = [self.locations[index] for index in indices]
-            for result in results:
-                result['country'] = self.countries.get(
-                    result['country_code'],
-                    ''
-                )
-            return results
+            return self.cities[indices], self.country_names[indices]
 
 
     def download(self):
@@ -131,34 +213,47 @@ class GeocodeData(metaclass=Singleton):
     def extract(self, local_filename):
         """Extract geocode data from zip
         """
-        if os.path.exists(local_filename):
-            # open compact CSV
-            rows = csv.reader(open(local_filename, encoding='utf8'))
-        else:
+        if not os.path.exists(local_filename):
             if not os.path.exists(GEOCODE_FILENAME):
                 # remove GEOCODE_FILENAME to get updated data
-                local_filename = self.download()
-                z = ZipFile(local_filename)
-                open(GEOCODE_FILENAME, 'wb').write(z.read(GEOCODE_FILENAME))
+                zip_filename = self.download()
+                with ZipFile(zip_filename) as z, \
+                    open(GEOCODE_FILENAME, 'wb') as fp:
+                    fp.write(z.read(GEOCODE_FILENAME))
 
             # extract coordinates into more compact CSV for faster loading
-            writer = csv.writer(open(local_filename, 'w', encoding='utf8'))
-            rows = []
-            for row in csv.reader(open(GEOCODE_FILENAME), delimiter='\t'):
-                latitude, longitude = row[4:6]
-                country_code = row[8]
-                if latitude and longitude and country_code:
-                    city = row[1]
-                    row = latitude, longitude, country_code, city
-                    writer.writerow(row)
-                    rows.append(row)
-
-        # load a list of known coordinates and corresponding locations
-        coordinates, locations = [], []
-        for latitude, longitude, country_code, city in rows:
-            coordinates.append((latitude, longitude))
-            locations.append(dict(country_code=country_code, city=city))
-        return coordinates, locations
+            with open(GEOCODE_FILENAME, encoding='utf8', newline='') as source, \
+                open(local_filename, 'w', encoding='utf8', newline='') as fp:
+                writer = csv.writer(fp)
+                for row in csv.reader(source, delimiter='\t'):
+                    latitude, longitude = row[4:6]
+                    country_code = row[8]
+                    if latitude and longitude and country_code:
+                        city = row[1]
+                        writer.writerow((latitude, longitude, country_code, city))
+
+        # load the known coordinates straight into an array of floats
+        coordinates = np.loadtxt(
+            local_filename,
+            delimiter=',',
+            usecols=(0, 1),
+            dtype=np.float64,
+            ndmin=2,
+            encoding='utf8',
+            quotechar='"'
+        )
+
+        # load the corresponding cities and country codes
+        cities, country_codes = [], []
+        with open(local_filename, encoding='utf8') as fp:
+            for _, _, country_code, city in csv.reader(fp):
+                cities.append(city)
+                country_codes.append(country_code)
+        return (
+            coordinates,
+            np.array(cities, dtype=object),
+            np.array(country_codes, dtype=object)
+        )
 
 ## Helper function declaration
 
@@ -167,6 +262,43 @@ def rel_path(filename):
     """
     return os.path.join(os.getcwd(), os.path.dirname(__file__), filename)
 
+def is_up_to_date(filename, source_filename):
+    """Return whether the file exists and is no older than its source file
+    """
+    if not os.path.exists(filename):
+        return False
+    if not os.path.exists(source_filename):
+        return True
+    return os.path.getmtime(filename) >= os.path.getmtime(source_filename)
+
+def write_atomically(filename, write):
+    """Write to a temporary file beside this filename using the write function
+    provided, only replacing the filename once the write has completed
+    """
+    fd, temp_filename = mkstemp(
+        dir=os.path.dirname(filename),
+        prefix=os.path.basename(filename),
+        suffix='.tmp'
+    )
+    try:
+        with os.fdopen(fd, 'wb') as fp:
+            write(fp)
+        os.chmod(temp_filename, 0o644)
+        os.replace(temp_filename, filename)
+    except BaseException:
+        os.remove(temp_filename)
+        raise
+
+def pack_strings(strings):
+    """Pack an array of strings into a variable width array of utf8 bytes
+    """
+    return np.frombuffer('\0'.join(strings).encode('utf8'), dtype=np.uint8)
+
+def unpack_strings(packed):
+    """Unpack an array of utf8 bytes packed by :func:`pack_strings`
+    """
+    return np.array(packed.tobytes().decode('utf8').split('\0'), dtype=object)
+
 ## Reversing functions declarations
 
 def reverse_coordinates(coordinate):
@@ -176,14 +308,19 @@ def reverse_coordinates(coordinate):
     :type coordinate: tuple
     """
     gd = GeocodeData()
-    return gd.query([coordinate])[0]
+    cities, countries = gd.query([coordinate])
+    return dict(city=cities[0], country=countries[0])
 
 
 def search(coordinates):
     """Search for closest known locations to these coordinates.
 
-    :param coordinates: A list of tuples of (latitude, longitude) coordinates.
-    :type coordinates: list[tuple]
+    :param coordinates: A list of tuples of (latitude, longitude) coordinates,
+     or an (N, 2) array of them to be queried in a single batch.
+    :type coordinates: list[tuple] | numpy.ndarray
+
+    :return: Arrays of the cities and countries matched to each coordinate.
+    :rtype: tuple[numpy.ndarray, numpy.ndarray]
     """
     gd = GeocodeData()
     return gd.query(coordinates)
\ No newline at end of file